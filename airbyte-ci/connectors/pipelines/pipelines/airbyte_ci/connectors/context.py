@@ -6,16 +6,21 @@
 
 from __future__ import annotations
 
-from copy import deepcopy
-from datetime import datetime
+import dataclasses
+import hashlib
+import json
+import os
+import time
+from datetime import datetime, timezone
+from functools import cache, cached_property
 from pathlib import Path
 from types import TracebackType
 from typing import TYPE_CHECKING
 
+import anyio
 import yaml  # type: ignore
 from asyncer import asyncify
 from dagger import Directory, Platform, Secret
-from github import PullRequest
 from pipelines.airbyte_ci.connectors.consts import CONNECTOR_TEST_STEP_ID
 from pipelines.airbyte_ci.connectors.reports import ConnectorReport
 from pipelines.consts import BUILD_PLATFORMS
@@ -29,7 +34,15 @@ from pipelines.models.contexts.pipeline_context import PipelineContext
 
 if TYPE_CHECKING:
     from pathlib import Path as NativePath
-    from typing import Dict, FrozenSet, List, Optional, Sequence
+    from typing import Any, Awaitable, Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+    from github import PullRequest
+
+# Prefer the libyaml backed loader when available, it is much faster than the pure Python one
+try:
+    from yaml import CSafeLoader as _SafeLoader  # type: ignore
+except ImportError:
+    from yaml import SafeLoader as _SafeLoader  # type: ignore
 
 # These test suite names are declared in metadata.yaml files
 TEST_SUITE_NAME_TO_STEP_ID = {
@@ -37,11 +50,140 @@ TEST_SUITE_NAME_TO_STEP_ID = {
     "integrationTests": CONNECTOR_TEST_STEP_ID.INTEGRATION,
     "acceptanceTests": CONNECTOR_TEST_STEP_ID.ACCEPTANCE,
 }
+# Immutable snapshot of the mapping above, iterated when computing the steps to skip according to metadata
+_TEST_SUITE_ITEMS: Tuple[Tuple[str, CONNECTOR_TEST_STEP_ID], ...] = tuple(TEST_SUITE_NAME_TO_STEP_ID.items())
+
+_update_commit_status_check_async = asyncify(update_commit_status_check)
+_send_message_to_webhook_async = asyncify(send_message_to_webhook)
+
+
+# Parsed metadata files shared by all the contexts of a process, keyed by path and stored with the fingerprint of the parsed file.
+# The fingerprint is the (inode, size, mtime_ns, ctime_ns) of the file: atomic replacements are detected through the inode change,
+# but an in place rewrite keeping the same size within a single timestamp tick of the filesystem is not detected.
+_METADATA_CACHE: Dict[str, Tuple[List[int], dict]] = {}
+_METADATA_CACHE_MAX_SIZE = 512
+
+
+def _get_metadata_file_fingerprint(metadata_path: Path) -> List[int]:
+    stat = metadata_path.stat()
+    return [stat.st_ino, stat.st_size, stat.st_mtime_ns, stat.st_ctime_ns]
+
+
+@cache
+def _get_metadata_json_cache_dir() -> Optional[Path]:
+    """Get the directory storing JSON copies of parsed metadata files, reused across processes as JSON decoding is much faster than YAML parsing.
+
+    Returns:
+        Optional[Path]: The absolute path to the directory, None if no user cache directory can be found.
+    """
+    xdg_cache_home = os.environ.get("XDG_CACHE_HOME", "")
+    # The XDG base directory specification says that empty or relative paths must be ignored
+    if os.path.isabs(xdg_cache_home):
+        cache_home = Path(xdg_cache_home)
+    else:
+        try:
+            cache_home = Path.home() / ".cache"
+        except (RuntimeError, KeyError):
+            return None
+    if not cache_home.is_absolute():
+        return None
+    return cache_home / "airbyte-ci" / "metadata"
+
+
+def _get_metadata_json_cache_path(metadata_path: Path) -> Optional[Path]:
+    json_cache_dir = _get_metadata_json_cache_dir()
+    if json_cache_dir is None:
+        return None
+    return json_cache_dir / f"{hashlib.sha256(str(metadata_path.resolve()).encode()).hexdigest()}.json"
+
+
+def _read_metadata_json_cache(metadata_path: Path, fingerprint: List[int]) -> Optional[dict]:
+    """Read the JSON copy of a metadata file if it was written from the current version of the file.
+
+    Args:
+        metadata_path (Path): Path to the metadata file.
+        fingerprint (List[int]): The fingerprint of the metadata file.
+
+    Returns:
+        Optional[dict]: The data section of the metadata file, None if there is no valid JSON copy.
+    """
+    json_cache_path = _get_metadata_json_cache_path(metadata_path)
+    if json_cache_path is None:
+        return None
+    try:
+        json_cache = json.loads(json_cache_path.read_bytes())
+    except (OSError, ValueError):
+        return None
+    if not isinstance(json_cache, dict) or json_cache.get("fingerprint") != fingerprint:
+        return None
+    return json_cache.get("data")
+
+
+def _write_metadata_json_cache(metadata_path: Path, fingerprint: List[int], metadata: dict) -> None:
+    """Write a JSON copy of a parsed metadata file. This is best effort: a failure only means the next process will parse the YAML file.
+
+    Args:
+        metadata_path (Path): Path to the metadata file.
+        fingerprint (List[int]): The fingerprint of the metadata file.
+        metadata (dict): The data section of the metadata file.
+    """
+    try:
+        serialized_metadata = json.dumps({"fingerprint": fingerprint, "data": metadata})
+    except (TypeError, ValueError):
+        # The metadata contains values that can't be represented in JSON
+        return
+    if json.loads(serialized_metadata)["data"] != metadata:
+        # The metadata does not survive a JSON round trip (e.g. non string keys)
+        return
+    json_cache_path = _get_metadata_json_cache_path(metadata_path)
+    if json_cache_path is None:
+        return
+    tmp_json_cache_path = json_cache_path.with_suffix(f".{os.getpid()}.tmp")
+    try:
+        json_cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_json_cache_path.write_text(serialized_metadata)
+        os.replace(tmp_json_cache_path, json_cache_path)
+    except OSError:
+        # Do not leave a partially written or orphaned temporary file in the cache directory
+        tmp_json_cache_path.unlink(missing_ok=True)
+
+
+def _load_metadata(metadata_path: Path) -> dict:
+    """Parse a metadata file, or get it from the module or JSON caches if the file did not change since it was last parsed.
+
+    Args:
+        metadata_path (Path): Path to the metadata file.
+
+    Returns:
+        dict: The data section of the metadata file. It is shared with the other callers and must not be mutated.
+    """
+    fingerprint = _get_metadata_file_fingerprint(metadata_path)
+    cache_key = str(metadata_path)
+    cached = _METADATA_CACHE.get(cache_key)
+    if cached is not None and cached[0] == fingerprint:
+        return cached[1]
+
+    metadata = _read_metadata_json_cache(metadata_path, fingerprint)
+    if metadata is None:
+        with metadata_path.open("rb") as metadata_file:
+            metadata = yaml.load(metadata_file, Loader=_SafeLoader)["data"]
+        _write_metadata_json_cache(metadata_path, fingerprint, metadata)
+
+    if cache_key not in _METADATA_CACHE and len(_METADATA_CACHE) >= _METADATA_CACHE_MAX_SIZE:
+        # Evict the oldest entry to keep the cache bounded
+        _METADATA_CACHE.pop(next(iter(_METADATA_CACHE)))
+    _METADATA_CACHE[cache_key] = (fingerprint, metadata)
+    return metadata
 
 
 class ConnectorContext(PipelineContext):
     """The connector context is used to store configuration for a specific connector pipeline run."""
 
+    secrets_dir: Optional[Directory]
+    updated_secrets_dir: Optional[Directory]
+    _connector_secrets: Optional[Dict[str, Secret]]
+    cdk_version: Optional[str]
+
     DEFAULT_CONNECTOR_ACCEPTANCE_TEST_IMAGE = "airbyte/connector-acceptance-test:dev"
 
     def __init__(
@@ -77,7 +219,7 @@ class ConnectorContext(PipelineContext):
         s3_build_cache_access_key_id: Optional[str] = None,
         s3_build_cache_secret_key: Optional[str] = None,
         concurrent_cat: Optional[bool] = False,
-        run_step_options: RunStepOptions = RunStepOptions(),
+        run_step_options: Optional[RunStepOptions] = None,
         targeted_platforms: Sequence[Platform] = BUILD_PLATFORMS,
     ) -> None:
         """Initialize a connector context.
@@ -107,16 +249,20 @@ class ConnectorContext(PipelineContext):
             s3_build_cache_access_key_id (Optional[str], optional): Gradle S3 Build Cache credentials. Defaults to None.
             s3_build_cache_secret_key (Optional[str], optional): Gradle S3 Build Cache credentials. Defaults to None.
             concurrent_cat (bool, optional): Whether to run the CAT tests in parallel. Defaults to False.
+            run_step_options (Optional[RunStepOptions], optional): The options to run the pipeline steps with. Defaults to None, in which case default RunStepOptions are used.
             targeted_platforms (Optional[Iterable[Platform]], optional): The platforms to build the connector image for. Defaults to BUILD_PLATFORMS.
         """
 
+        if run_step_options is None:
+            run_step_options = RunStepOptions()
+
         self.pipeline_name = pipeline_name
         self.connector = connector
         self.use_remote_secrets = use_remote_secrets
         self.connector_acceptance_test_image = connector_acceptance_test_image
-        self._secrets_dir: Optional[Directory] = None
-        self._updated_secrets_dir: Optional[Directory] = None
-        self.cdk_version: Optional[str] = None
+        self.secrets_dir = None
+        self.updated_secrets_dir = None
+        self.cdk_version = None
         self.should_save_report = should_save_report
         self.code_tests_only = code_tests_only
         self.use_local_cdk = use_local_cdk
@@ -127,8 +273,15 @@ class ConnectorContext(PipelineContext):
         self.s3_build_cache_access_key_id = s3_build_cache_access_key_id
         self.s3_build_cache_secret_key = s3_build_cache_secret_key
         self.concurrent_cat = concurrent_cat
-        self._connector_secrets: Optional[Dict[str, Secret]] = None
+        self._connector_secrets = None
+        self._connector_secrets_lock = anyio.Lock()
         self.targeted_platforms = targeted_platforms
+        # The connector metadata is immutable over a run: the steps skipped according to its connectorTestSuitesOptions are computed once
+        metadata = self.metadata
+        enabled_test_suites = {option["suite"] for option in metadata.get("connectorTestSuitesOptions", [])}
+        self._metadata_skip_steps = tuple(
+            step_id for test_suite_name, step_id in _TEST_SUITE_ITEMS if test_suite_name not in enabled_test_suites
+        )
 
         super().__init__(
             pipeline_name=pipeline_name,
@@ -153,43 +306,27 @@ class ConnectorContext(PipelineContext):
             enable_report_auto_open=enable_report_auto_open,
         )
 
-    @property
+    @cached_property
     def s3_build_cache_access_key_id_secret(self) -> Optional[Secret]:
         if self.s3_build_cache_access_key_id:
             return self.dagger_client.set_secret("s3_build_cache_access_key_id", self.s3_build_cache_access_key_id)
         return None
 
-    @property
+    @cached_property
     def s3_build_cache_secret_key_secret(self) -> Optional[Secret]:
         if self.s3_build_cache_access_key_id and self.s3_build_cache_secret_key:
             return self.dagger_client.set_secret("s3_build_cache_secret_key", self.s3_build_cache_secret_key)
         return None
 
-    @property
+    @cached_property
     def modified_files(self) -> FrozenSet[NativePath]:
         return self.connector.modified_files
 
-    @property
-    def secrets_dir(self) -> Optional[Directory]:
-        return self._secrets_dir
-
-    @secrets_dir.setter
-    def secrets_dir(self, secrets_dir: Directory) -> None:
-        self._secrets_dir = secrets_dir
-
-    @property
-    def updated_secrets_dir(self) -> Optional[Directory]:
-        return self._updated_secrets_dir
-
-    @updated_secrets_dir.setter
-    def updated_secrets_dir(self, updated_secrets_dir: Directory) -> None:
-        self._updated_secrets_dir = updated_secrets_dir
-
-    @property
+    @cached_property
     def connector_acceptance_test_source_dir(self) -> Directory:
         return self.get_repo_dir("airbyte-integrations/bases/connector-acceptance-test")
 
-    @property
+    @cached_property
     def live_tests_dir(self) -> Directory:
         return self.get_repo_dir("airbyte-ci/connectors/live-tests")
 
@@ -205,9 +342,13 @@ class ConnectorContext(PipelineContext):
     def metadata_path(self) -> Path:
         return self.connector.code_directory / METADATA_FILE_NAME
 
-    @property
+    @cached_property
     def metadata(self) -> dict:
-        return yaml.safe_load(self.metadata_path.read_text())["data"]
+        """The data section of the connector metadata file.
+
+        The same dict is shared by all the contexts of the connector in the current process: it must not be mutated.
+        """
+        return _load_metadata(self.metadata_path)
 
     @property
     def docker_repository(self) -> str:
@@ -221,21 +362,23 @@ class ConnectorContext(PipelineContext):
     def docker_image(self) -> str:
         return f"{self.docker_repository}:{self.docker_image_tag}"
 
-    @property
+    @cached_property
     def docker_hub_username_secret(self) -> Optional[Secret]:
         if self.docker_hub_username is None:
             return None
         return self.dagger_client.set_secret("docker_hub_username", self.docker_hub_username)
 
-    @property
+    @cached_property
     def docker_hub_password_secret(self) -> Optional[Secret]:
         if self.docker_hub_password is None:
             return None
         return self.dagger_client.set_secret("docker_hub_password", self.docker_hub_password)
 
     async def get_connector_secrets(self) -> Dict[str, Secret]:
-        if self._connector_secrets is None:
-            self._connector_secrets = await secrets.get_connector_secrets(self)
+        # The lock makes sure concurrent steps don't fetch the connector secrets multiple times
+        async with self._connector_secrets_lock:
+            if self._connector_secrets is None:
+                self._connector_secrets = await secrets.get_connector_secrets(self)
         return self._connector_secrets
 
     async def get_connector_dir(self, exclude: Optional[List[str]] = None, include: Optional[List[str]] = None) -> Directory:
@@ -259,7 +402,10 @@ class ConnectorContext(PipelineContext):
         On the context exit the following operations will happen:
             - Upload updated connector secrets back to Google Secret Manager
             - Write a test report in JSON format locally and to S3 if running in a CI environment
-            - Update the commit status check on GitHub if running in a CI environment.
+            - Once the above are done: update the commit status check on GitHub if running in a CI environment
+            and send a message to Slack if a webhook and a channel are configured.
+        Operations of the same stage run concurrently. A failing operation is logged and does not prevent the other ones from running:
+        if the report upload failed, the commit status check and the Slack message can link to a report that was not uploaded.
         It should gracefully handle the execution error that happens and always upload a test report and update commit status check.
         Args:
             exception_type (Optional[type[BaseException]]): The exception type if an exception was raised in the context execution, None otherwise.
@@ -268,7 +414,9 @@ class ConnectorContext(PipelineContext):
         Returns:
             bool: Whether the teardown operation ran successfully.
         """
-        self.stopped_at = datetime.utcnow()
+        # Keep a naive UTC timestamp to stay comparable with started_at and created_at, durations are computed from the monotonic clock
+        self.stopped_at = datetime.now(timezone.utc).replace(tzinfo=None)
+        self.stopped_at_ns = time.monotonic_ns()
         self.state = self.determine_final_state(self.report, exception_value)
         if exception_value:
             self.logger.error("An error got handled by the ConnectorContext", exc_info=True)
@@ -276,37 +424,57 @@ class ConnectorContext(PipelineContext):
             self.logger.error("No test report was provided. This is probably due to an upstream error")
             self.report = ConnectorReport(self, [])
 
-        if self.should_save_updated_secrets:
-            await secrets.upload(self)
-
         self.report.print()
 
-        if self.should_save_report:
-            await self.report.save()
-
-        await asyncify(update_commit_status_check)(**self.github_commit_status)
-
-        if self.should_send_slack_message:
-            # Using a type ignore here because the should_send_slack_message property is checking for non nullity of the slack_webhook and reporting_slack_channel
-            await asyncify(send_message_to_webhook)(self.create_slack_message(), self.reporting_slack_channel, self.slack_webhook)  # type: ignore
+        # These teardown operations are independent network calls, we run them concurrently.
+        # Each operation logs its own failure so that it does not cancel the other ones.
+        async with anyio.create_task_group() as tg:
+            if self.should_save_updated_secrets:
+                tg.start_soon(self._run_teardown_operation, "Updated secrets upload", secrets.upload(self))
+            if self.should_save_report:
+                tg.start_soon(self._run_teardown_operation, "Report save", self.report.save())
+
+        # The commit status check and the Slack message link to the report: they're sent once it has been saved.
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(
+                self._run_teardown_operation, "Commit status check update", _update_commit_status_check_async(**self.github_commit_status)
+            )
+            if self.should_send_slack_message:
+                # Using a type ignore here because the should_send_slack_message property is checking for non nullity of the slack_webhook and reporting_slack_channel
+                tg.start_soon(
+                    self._run_teardown_operation,
+                    "Slack message",
+                    _send_message_to_webhook_async(self.create_slack_message(), self.reporting_slack_channel, self.slack_webhook),  # type: ignore
+                )
 
         # Supress the exception if any
         return True
 
+    async def _run_teardown_operation(self, operation_name: str, operation: Awaitable[Any]) -> None:
+        """Await a teardown operation and log its failure instead of raising it.
+
+        Args:
+            operation_name (str): The name of the operation to use in the logs.
+            operation (Awaitable[Any]): The teardown operation to await.
+        """
+        try:
+            await operation
+        except Exception:
+            self.logger.error(f"{operation_name} failed during the context teardown", exc_info=True)
+
     def create_slack_message(self) -> str:
         raise NotImplementedError
 
     def _get_step_id_to_skip_according_to_metadata(self) -> List[CONNECTOR_TEST_STEP_ID]:
         """The connector metadata have a connectorTestSuitesOptions field.
         It allows connector developers to declare the test suites that are enabled for a connector.
-        This function retrieved enabled test suites according to this field value and returns the test suites steps that are skipped (because they're not declared in this field.)
+        The test suites steps that are skipped (because they're not declared in this field) are computed once from this field value when the context is initialized.
         The skippable test suites steps are declared in TEST_SUITE_NAME_TO_STEP_ID.
 
         Returns:
             List[CONNECTOR_TEST_STEP_ID]: List of step ids that should be skipped according to connector metadata.
         """
-        enabled_test_suites = [option["suite"] for option in self.metadata.get("connectorTestSuitesOptions", [])]
-        return [step_id for test_suite_name, step_id in TEST_SUITE_NAME_TO_STEP_ID.items() if test_suite_name not in enabled_test_suites]
+        return list(self._metadata_skip_steps)
 
     def _skip_metadata_disabled_test_suites(self, run_step_options: RunStepOptions) -> RunStepOptions:
         """Updated the original run_step_options to skip the disabled test suites according to connector metadata.
@@ -317,6 +485,7 @@ class ConnectorContext(PipelineContext):
         Returns:
             RunStepOptions: Updated run step options.
         """
-        run_step_options = deepcopy(run_step_options)
+        # Only skip_steps is mutated, there's no need to deep copy the whole options object
+        run_step_options = dataclasses.replace(run_step_options, skip_steps=list(run_step_options.skip_steps))
         run_step_options.skip_steps += self._get_step_id_to_skip_according_to_metadata()
         return run_step_options
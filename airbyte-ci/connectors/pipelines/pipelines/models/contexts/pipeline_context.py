@@ -8,7 +8,8 @@ from __future__ import annotations
 
 import logging
 import os
-from datetime import datetime
+import time
+from datetime import datetime, timezone
 from functools import lru_cache
 from glob import glob
 from types import TracebackType
@@ -38,6 +39,8 @@ class PipelineContext:
     dockerd_service: Optional[Service]
     started_at: Optional[datetime]
     stopped_at: Optional[datetime]
+    started_at_ns: Optional[int]
+    stopped_at_ns: Optional[int]
 
     secrets_to_mask: List[str]
 
@@ -114,7 +117,7 @@ class PipelineContext:
         self.gha_workflow_run_url = gha_workflow_run_url
         self.dagger_logs_url = dagger_logs_url
         self.pipeline_start_timestamp = pipeline_start_timestamp
-        self.created_at = datetime.utcnow()
+        self.created_at = datetime.now(timezone.utc).replace(tzinfo=None)
         self.ci_context = ci_context
         self.state = ContextState.INITIALIZED
         self.is_ci_optional = is_ci_optional
@@ -131,6 +134,8 @@ class PipelineContext:
         self.ci_github_access_token = ci_github_access_token
         self.started_at = None
         self.stopped_at = None
+        self.started_at_ns = None
+        self.stopped_at_ns = None
         self.secrets_to_mask = []
         self.run_step_options = run_step_options
         self.enable_report_auto_open = enable_report_auto_open
@@ -280,7 +285,8 @@ class PipelineContext:
         if self.dagger_client is None:
             raise Exception("A Pipeline can't be entered with an undefined dagger_client")
         self.state = ContextState.RUNNING
-        self.started_at = datetime.utcnow()
+        self.started_at = datetime.now(timezone.utc).replace(tzinfo=None)
+        self.started_at_ns = time.monotonic_ns()
         self.logger.info("Caching the latest CDK version...")
         await asyncify(update_commit_status_check)(**self.github_commit_status)
         if self.should_send_slack_message:
@@ -337,7 +343,8 @@ class PipelineContext:
             self.report = Report(self, steps_results=[])
 
         self.state = self.determine_final_state(self.report, exception_value)
-        self.stopped_at = datetime.utcnow()
+        self.stopped_at = datetime.now(timezone.utc).replace(tzinfo=None)
+        self.stopped_at_ns = time.monotonic_ns()
 
         self.report.print()
 
@@ -76,6 +76,9 @@ class Report:
     def run_duration(self) -> timedelta:
         assert self.pipeline_context.started_at is not None, "The pipeline started_at timestamp must be set to save reports."
         assert self.pipeline_context.stopped_at is not None, "The pipeline stopped_at timestamp must be set to save reports."
+        # Prefer the monotonic clock readings as wall clock time can jump during a run
+        if self.pipeline_context.started_at_ns is not None and self.pipeline_context.stopped_at_ns is not None:
+            return timedelta(microseconds=(self.pipeline_context.stopped_at_ns - self.pipeline_context.started_at_ns) / 1000)
         return self.pipeline_context.stopped_at - self.pipeline_context.started_at
 
     @property
@@ -13,6 +13,7 @@ import git
 import pytest
 import requests
 from connector_ops.utils import Connector
+from pipelines.airbyte_ci.connectors import context as connector_context
 from pipelines.helpers import utils
 from tests.utils import ALL_CONNECTORS
 
@@ -73,6 +74,17 @@ def from_airbyte_root(airbyte_repo_path):
     os.chdir(original_dir)
 
 
+@pytest.fixture(autouse=True)
+def metadata_json_cache_dir(tmp_path, mocker) -> Path:
+    """
+    Redirect the JSON cache of parsed connector metadata files to a temporary directory.
+    This prevents tests from writing to, or reading stale copies from, the user cache directory.
+    """
+    json_cache_dir = tmp_path / "metadata_json_cache"
+    mocker.patch.object(connector_context, "_get_metadata_json_cache_dir", return_value=json_cache_dir)
+    return json_cache_dir
+
+
 @pytest.fixture(scope="session")
 def all_connectors() -> List[Connector]:
     return sorted(ALL_CONNECTORS, key=lambda connector: connector.technical_name)
@@ -0,0 +1,195 @@
+#
+# Copyright (c) 2024 Airbyte, Inc., all rights reserved.
+#
+
+import os
+
+import anyio
+import pytest
+from pipelines.airbyte_ci.connectors import context
+from pipelines.helpers.connectors.modifed import ConnectorWithModifiedFiles
+
+
+# Captured at import time, before the conftest metadata_json_cache_dir fixture patches it
+_get_metadata_json_cache_dir = context._get_metadata_json_cache_dir.__wrapped__
+
+
+@pytest.fixture(autouse=True)
+def clear_metadata_cache():
+    context._METADATA_CACHE.clear()
+    yield
+    context._METADATA_CACHE.clear()
+
+
+@pytest.fixture
+def connector_context():
+    return context.ConnectorContext(
+        pipeline_name="test",
+        connector=ConnectorWithModifiedFiles("source-faker", frozenset()),
+        git_branch="test",
+        git_revision="test",
+        diffed_branch="test",
+        git_repo_url="test",
+        report_output_prefix="test",
+        is_local=True,
+    )
+
+
+def test_load_metadata_is_cached(tmp_path):
+    metadata_path = tmp_path / "metadata.yaml"
+    metadata_path.write_text("data:\n  dockerImageTag: 0.1.0\n")
+
+    first_load = context._load_metadata(metadata_path)
+    assert first_load == {"dockerImageTag": "0.1.0"}
+    assert context._load_metadata(metadata_path) is first_load
+
+
+def test_load_metadata_is_refreshed_when_file_changes(tmp_path):
+    metadata_path = tmp_path / "metadata.yaml"
+    metadata_path.write_text("data:\n  dockerImageTag: 0.1.0\n")
+    assert context._load_metadata(metadata_path) == {"dockerImageTag": "0.1.0"}
+
+    metadata_path.write_text("data:\n  dockerImageTag: 0.2.0\n")
+    stat = metadata_path.stat()
+    os.utime(metadata_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert context._load_metadata(metadata_path) == {"dockerImageTag": "0.2.0"}
+
+
+def test_load_metadata_is_refreshed_when_file_is_replaced_with_same_size_and_mtime(tmp_path):
+    metadata_path = tmp_path / "metadata.yaml"
+    metadata_path.write_text("data:\n  dockerImageTag: 0.1.0\n")
+    assert context._load_metadata(metadata_path) == {"dockerImageTag": "0.1.0"}
+    original_stat = metadata_path.stat()
+
+    replacement_path = tmp_path / "metadata.yaml.tmp"
+    replacement_path.write_text("data:\n  dockerImageTag: 0.2.0\n")
+    os.utime(replacement_path, ns=(original_stat.st_atime_ns, original_stat.st_mtime_ns))
+    os.replace(replacement_path, metadata_path)
+
+    new_stat = metadata_path.stat()
+    assert (new_stat.st_size, new_stat.st_mtime_ns) == (original_stat.st_size, original_stat.st_mtime_ns)
+    assert context._load_metadata(metadata_path) == {"dockerImageTag": "0.2.0"}
+
+
+def test_load_metadata_cache_is_bounded(tmp_path, mocker):
+    mocker.patch.object(context, "_METADATA_CACHE_MAX_SIZE", 2)
+    for i in range(3):
+        metadata_path = tmp_path / f"metadata_{i}.yaml"
+        metadata_path.write_text(f"data:\n  dockerImageTag: 0.{i}.0\n")
+        context._load_metadata(metadata_path)
+
+    assert list(context._METADATA_CACHE) == [str(tmp_path / "metadata_1.yaml"), str(tmp_path / "metadata_2.yaml")]
+
+
+def test_load_metadata_uses_json_cache(tmp_path, mocker, metadata_json_cache_dir):
+    metadata_path = tmp_path / "metadata.yaml"
+    metadata_path.write_text("data:\n  dockerImageTag: 0.1.0\n")
+    context._load_metadata(metadata_path)
+    assert len(list(metadata_json_cache_dir.iterdir())) == 1
+
+    # Simulate a new process: the metadata must be read from the JSON cache, without parsing the YAML file
+    context._METADATA_CACHE.clear()
+    mocker.patch.object(context.yaml, "load", side_effect=AssertionError("The YAML file should not be parsed"))
+    assert context._load_metadata(metadata_path) == {"dockerImageTag": "0.1.0"}
+
+
+def test_load_metadata_skips_json_cache_for_non_json_metadata(tmp_path, metadata_json_cache_dir):
+    metadata_path = tmp_path / "metadata.yaml"
+    metadata_path.write_text("data:\n  releaseDate: 2024-01-01\n  1: one\n")
+    context._load_metadata(metadata_path)
+    assert not metadata_json_cache_dir.exists()
+
+
+def test_load_metadata_cleans_up_json_cache_tmp_file_on_failure(tmp_path, mocker, metadata_json_cache_dir):
+    mocker.patch.object(context.os, "replace", side_effect=OSError("Replace failed"))
+    metadata_path = tmp_path / "metadata.yaml"
+    metadata_path.write_text("data:\n  dockerImageTag: 0.1.0\n")
+    assert context._load_metadata(metadata_path) == {"dockerImageTag": "0.1.0"}
+    assert list(metadata_json_cache_dir.iterdir()) == []
+
+
+def test_load_metadata_without_json_cache_dir(tmp_path, mocker):
+    mocker.patch.object(context, "_get_metadata_json_cache_dir", return_value=None)
+    metadata_path = tmp_path / "metadata.yaml"
+    metadata_path.write_text("data:\n  dockerImageTag: 0.1.0\n")
+    assert context._load_metadata(metadata_path) == {"dockerImageTag": "0.1.0"}
+
+
+@pytest.mark.parametrize("xdg_cache_home", [None, "", "relative/cache"])
+def test_get_metadata_json_cache_dir_defaults_to_home_cache(tmp_path, monkeypatch, xdg_cache_home):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    if xdg_cache_home is None:
+        monkeypatch.delenv("XDG_CACHE_HOME", raising=False)
+    else:
+        monkeypatch.setenv("XDG_CACHE_HOME", xdg_cache_home)
+    assert _get_metadata_json_cache_dir() == tmp_path / ".cache" / "airbyte-ci" / "metadata"
+
+
+def test_get_metadata_json_cache_dir_uses_absolute_xdg_cache_home(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    assert _get_metadata_json_cache_dir() == tmp_path / "airbyte-ci" / "metadata"
+
+
+def test_get_metadata_json_cache_dir_without_home(monkeypatch, mocker):
+    monkeypatch.delenv("XDG_CACHE_HOME", raising=False)
+    mocker.patch.object(context.Path, "home", side_effect=RuntimeError("Could not determine home directory."))
+    assert _get_metadata_json_cache_dir() is None
+
+
+@pytest.mark.anyio
+async def test_get_connector_secrets_fetches_secrets_once(connector_context, mocker):
+    connector_secrets = {"config.json": mocker.Mock()}
+
+    async def slow_get_connector_secrets(_):
+        await anyio.sleep(0.1)
+        return connector_secrets
+
+    get_connector_secrets = mocker.patch.object(
+        context.secrets, "get_connector_secrets", mocker.AsyncMock(side_effect=slow_get_connector_secrets)
+    )
+
+    results = []
+
+    async def get_secrets():
+        results.append(await connector_context.get_connector_secrets())
+
+    async with anyio.create_task_group() as tg:
+        for _ in range(5):
+            tg.start_soon(get_secrets)
+
+    get_connector_secrets.assert_awaited_once_with(connector_context)
+    assert len(results) == 5
+    assert all(result is connector_secrets for result in results)
+
+
+@pytest.mark.anyio
+async def test_aexit_runs_all_teardown_operations_when_one_fails(connector_context, mocker):
+    connector_context.slack_webhook = "https://slack.webhook"
+    connector_context.reporting_slack_channel = "#channel"
+    connector_context.updated_secrets_dir = mocker.MagicMock()
+    connector_context.logger = mocker.MagicMock()
+    mocker.patch.object(connector_context, "create_slack_message", return_value="message")
+
+    operations_order = []
+
+    async def save_report():
+        await anyio.sleep(0.1)
+        operations_order.append("report_save")
+
+    connector_context.report = mocker.MagicMock(failed_steps=[], success=True)
+    connector_context.report.save = mocker.AsyncMock(side_effect=save_report)
+    upload_secrets = mocker.patch.object(context.secrets, "upload", mocker.AsyncMock(side_effect=Exception("Upload failed")))
+    update_commit_status_check = mocker.patch.object(
+        context, "_update_commit_status_check_async", mocker.AsyncMock(side_effect=lambda **_: operations_order.append("commit_status"))
+    )
+    send_message_to_webhook = mocker.patch.object(context, "_send_message_to_webhook_async", mocker.AsyncMock())
+
+    assert await connector_context.__aexit__(None, None, None) is True
+
+    upload_secrets.assert_awaited_once_with(connector_context)
+    connector_context.report.save.assert_awaited_once()
+    update_commit_status_check.assert_awaited_once()
+    send_message_to_webhook.assert_awaited_once_with("message", "#channel", "https://slack.webhook")
+    # The commit status check links to the report, it must be updated once the report is saved
+    assert operations_order == ["report_save", "commit_status"]
+    connector_context.logger.error.assert_called_once_with("Updated secrets upload failed during the context teardown", exc_info=True)
@@ -0,0 +1,28 @@
+# Copyright (c) 2024 Airbyte, Inc., all rights reserved.
+
+from datetime import datetime, timedelta
+
+from pipelines.models.reports import Report
+
+
+def test_run_duration_uses_monotonic_clock(mocker):
+    pipeline_context = mocker.MagicMock(
+        started_at=datetime(2024, 1, 1, 0, 0, 0),
+        # The wall clock jumped backward during the run
+        stopped_at=datetime(2023, 12, 31, 23, 0, 0),
+        started_at_ns=1_000_000_000,
+        stopped_at_ns=3_500_000_000,
+    )
+    report = Report(pipeline_context=pipeline_context, steps_results=[])
+    assert report.run_duration == timedelta(seconds=2.5)
+
+
+def test_run_duration_falls_back_to_wall_clock(mocker):
+    pipeline_context = mocker.MagicMock(
+        started_at=datetime(2024, 1, 1, 0, 0, 0),
+        stopped_at=datetime(2024, 1, 1, 0, 1, 30),
+        started_at_ns=None,
+        stopped_at_ns=None,
+    )
+    report = Report(pipeline_context=pipeline_context, steps_results=[])
+    assert report.run_duration == timedelta(minutes=1, seconds=30)